@@ -2,14 +2,31 @@
 
 import asyncio
 import logging
+from datetime import timedelta
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_USERNAME, CONF_PASSWORD
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
 
 from .client import ViessmannClient, AuthError
-from .const import DOMAIN
+from .const import (
+    DOMAIN,
+    CONF_STALE_AFTER,
+    DEFAULT_STALE_AFTER,
+    CONF_SCAN_INTERVAL,
+    DEFAULT_SCAN_INTERVAL,
+    CONF_DETAIL_INTERVAL,
+    DEFAULT_DETAIL_INTERVAL,
+    TOKEN_CHECK_INTERVAL,
+    TOKEN_REFRESH_MARGIN,
+    STORAGE_VERSION,
+)
+from .coordinator import ViessmannCoordinator
+from .exceptions import InvalidCredentials, ViessmannError
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -28,30 +45,122 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
 
     client = ViessmannClient(username, password)
 
-    try:
-        await client.login()
-        # Ensure we can get device info
-        await client.get_family_devices()
-    except AuthError as e:
-        _LOGGER.error(f"Authentication failed: {e}")
-        return False
-    except Exception as e:
-        _LOGGER.error(f"Failed to connect: {e}")
-        raise ConfigEntryNotReady from e
+    options = entry.options
+    coordinator = ViessmannCoordinator(
+        hass,
+        entry,
+        client,
+        stale_after=timedelta(
+            seconds=options.get(CONF_STALE_AFTER, DEFAULT_STALE_AFTER)
+        ),
+        scan_interval=timedelta(
+            seconds=options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+        ),
+        detail_interval=timedelta(
+            seconds=options.get(CONF_DETAIL_INTERVAL, DEFAULT_DETAIL_INTERVAL)
+        ),
+    )
+
+    # Render the cached snapshots right away and go live in the background
+    restored = await coordinator.async_restore()
+    if not restored:
+        try:
+            await client.login()
+            # Ensure we can get device info
+            await coordinator.async_discover_devices()
+        except InvalidCredentials as e:
+            await client.close()
+            raise ConfigEntryAuthFailed(f"Authentication failed: {e}") from e
+        except Exception as e:
+            _LOGGER.error(f"Failed to connect: {e}")
+            await client.close()
+            raise ConfigEntryNotReady from e
+
+        _async_migrate_unique_ids(hass, entry, client._physics_id)
+
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except (ConfigEntryAuthFailed, ConfigEntryNotReady):
+            await client.close()
+            raise
 
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = client
+    hass.data[DOMAIN][entry.entry_id] = coordinator
+
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
+    async def _async_refresh_token(now) -> None:
+        """Refresh the token shortly before it expires."""
+        try:
+            await client.refresh_token_if_needed(TOKEN_REFRESH_MARGIN)
+        except ViessmannError as e:
+            # The 401 path in the client still covers us if this keeps failing
+            coordinator.failures.record_failure("Proactive token refresh", e)
+        else:
+            coordinator.failures.record_success("Proactive token refresh")
+
+    entry.async_on_unload(
+        async_track_time_interval(
+            hass, _async_refresh_token, timedelta(seconds=TOKEN_CHECK_INTERVAL)
+        )
+    )
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    if restored:
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} initial refresh"
+        )
+
     return True
 
 
+@callback
+def _async_migrate_unique_ids(
+    hass: HomeAssistant, entry: ConfigEntry, physics_id: str
+) -> None:
+    """Move the single-device unique IDs onto the default device."""
+    if not physics_id:
+        return
+
+    username = entry.data[CONF_USERNAME]
+    entity_registry = er.async_get(hass)
+    for platform, suffix in (
+        ("climate", "heating"),
+        ("water_heater", "dhw"),
+        ("sensor", "status"),
+    ):
+        entity_id = entity_registry.async_get_entity_id(
+            platform, DOMAIN, f"{username}_{suffix}"
+        )
+        if entity_id:
+            entity_registry.async_update_entity(
+                entity_id, new_unique_id=f"{username}_{physics_id}_{suffix}"
+            )
+
+
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry):
+    """Reload the config entry when options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Unload a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        client = hass.data[DOMAIN].pop(entry.entry_id)
-        await client.close()
+        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator.failures.async_clear()
+        await coordinator.async_flush_cache()
+        await coordinator.client.close()
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry):
+    """Remove the snapshot cache of a deleted config entry.
+
+    The entry is unloaded first, which leaves no write pending on the
+    coordinator's store.
+    """
+    await Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}").async_remove()
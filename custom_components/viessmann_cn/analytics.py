@@ -0,0 +1,165 @@
+"""Heating analytics computed over a device's recent sample history."""
+
+import math
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple
+
+import numpy as np
+
+# Only the most recent samples are used for rates and duty cycle
+ANALYTICS_WINDOW = 1800  # seconds
+# A burner run shorter than this counts as a short cycle
+SHORT_CYCLE_MIN_RUN = 300  # seconds
+# This many short cycles within the window flags the boiler as short-cycling
+SHORT_CYCLE_THRESHOLD = 3
+
+
+def _to_float(value: Any) -> float:
+    """Convert an API value to float, NaN if missing or malformed."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def history_size(scan_interval: float) -> int:
+    """Return how many samples to keep to cover the window.
+
+    Refreshes requested after commands add samples in between polls,
+    so keep twice what the scan interval alone would need.
+    """
+    return 2 * math.ceil(ANALYTICS_WINDOW / scan_interval) + 1
+
+
+@dataclass
+class HeatingAnalytics:
+    """Derived values for one device."""
+
+    ch_rate: Optional[float]  # °C/min
+    dhw_rate: Optional[float]  # °C/min
+    ch_time_to_target: Optional[float]  # minutes
+    dhw_time_to_target: Optional[float]  # minutes
+    duty_cycle: Optional[float]  # percent
+    short_cycles: int
+    short_cycling: bool
+
+
+class SampleHistory:
+    """Fixed-size ring buffer of scanStatus samples backed by NumPy arrays."""
+
+    def __init__(self, size: int):
+        self._data = np.full((4, size), np.nan)  # ts, chProbe, dhwProbe, fire
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, ts: float, scan_status: dict) -> bool:
+        """Add a sample, returns False if it is not newer than the last one."""
+        size = self._data.shape[1]
+        if self._count and ts <= self._data[0, (self._next - 1) % size]:
+            return False
+
+        self._data[:, self._next] = (
+            ts,
+            _to_float(scan_status.get("chProbe")),
+            _to_float(scan_status.get("dhwProbe")),
+            1.0 if scan_status.get("fire") == 1 else 0.0,
+        )
+        self._next = (self._next + 1) % size
+        self._count = min(self._count + 1, size)
+        return True
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Return ts, chProbe, dhwProbe and fire ordered oldest first."""
+        size = self._data.shape[1]
+        if self._count < size:
+            data = self._data[:, : self._count]
+        else:
+            data = np.roll(self._data, -self._next, axis=1)
+        return data[0], data[1], data[2], data[3]
+
+
+def _slope(ts: np.ndarray, values: np.ndarray, fire: np.ndarray) -> Optional[float]:
+    """Least-squares slope in units per minute while the burner is on.
+
+    Each burner run is centred on its own mean, so the cooling in between
+    runs doesn't flatten the rate. Missing values are ignored.
+    """
+    # Number the burner runs, samples with the burner off are dropped below
+    runs = np.cumsum(np.diff(fire, prepend=0) > 0)
+    mask = np.isfinite(values) & (fire == 1)
+    if np.count_nonzero(mask) < 2:
+        return None
+    runs = runs[mask]
+    t = ts[mask] / 60
+    y = values[mask]
+
+    counts = np.maximum(np.bincount(runs), 1)
+    t_centered = t - (np.bincount(runs, t) / counts)[runs]
+    y_centered = y - (np.bincount(runs, y) / counts)[runs]
+    denom = np.dot(t_centered, t_centered)
+    if denom == 0:
+        return None
+    return float(np.dot(t_centered, y_centered) / denom)
+
+
+def _time_to_target(
+    current: float, target: float, rate: Optional[float]
+) -> Optional[float]:
+    """Minutes until current reaches target at the given rate."""
+    if not np.isfinite(current) or not np.isfinite(target):
+        return None
+    if current >= target:
+        return 0.0
+    if rate is None or rate <= 0:
+        return None
+    return float((target - current) / rate)
+
+
+def _short_cycles(ts: np.ndarray, fire: np.ndarray) -> int:
+    """Count completed burner runs shorter than SHORT_CYCLE_MIN_RUN."""
+    edges = np.diff(fire)
+    starts = np.flatnonzero(edges > 0) + 1
+    stops = np.flatnonzero(edges < 0) + 1
+    if fire[0] == 1:
+        # The run in progress at the window start has an unknown length
+        stops = stops[1:]
+    runs = min(len(starts), len(stops))
+    if runs == 0:
+        return 0
+    durations = ts[stops[:runs]] - ts[starts[:runs]]
+    return int(np.count_nonzero(durations < SHORT_CYCLE_MIN_RUN))
+
+
+def compute_analytics(
+    history: SampleHistory, ch_set: Any, dhw_set: Any
+) -> Optional[HeatingAnalytics]:
+    """Compute heating analytics over the recent window of a device's history."""
+    if len(history) < 2:
+        return None
+
+    ts, ch, dhw, fire = history.arrays()
+    window = ts >= ts[-1] - ANALYTICS_WINDOW
+    ts, ch, dhw, fire = ts[window], ch[window], dhw[window], fire[window]
+
+    ch_rate = _slope(ts, ch, fire)
+    dhw_rate = _slope(ts, dhw, fire)
+
+    # Time-weighted share of the window with the burner on
+    dt = np.diff(ts)
+    total = dt.sum()
+    duty_cycle = float(np.dot(fire[:-1], dt) / total * 100) if total > 0 else None
+
+    short_cycles = _short_cycles(ts, fire)
+
+    return HeatingAnalytics(
+        ch_rate=ch_rate,
+        dhw_rate=dhw_rate,
+        ch_time_to_target=_time_to_target(ch[-1], _to_float(ch_set), ch_rate),
+        dhw_time_to_target=_time_to_target(dhw[-1], _to_float(dhw_set), dhw_rate),
+        duty_cycle=duty_cycle,
+        short_cycles=short_cycles,
+        short_cycling=short_cycles >= SHORT_CYCLE_THRESHOLD,
+    )
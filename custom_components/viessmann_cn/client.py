@@ -1,5 +1,7 @@
 import aiohttp
+import asyncio
 import logging
+import time
 from typing import Dict, List, Optional, Any
 
 from .const import (
@@ -14,12 +16,28 @@ from .const import (
     ENDPOINT_SET_DHW_TEMP,
     ENDPOINT_SET_MODE,
     DEFAULT_HEADERS,
+    MAX_LOGGED_LENGTH,
+    TOKEN_MIN_LEARNED_TTL,
 )
-from .exceptions import AuthError, NetworkError, ApiError
+from .exceptions import AuthError, InvalidCredentials, NetworkError, ApiError
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _collect_boilers(node: Any) -> List[Dict]:
+    """Find boilerInfos in the defaultRoom and any nested rooms."""
+    if isinstance(node, list):
+        return [boiler for item in node for boiler in _collect_boilers(item)]
+    if not isinstance(node, dict):
+        return []
+
+    boilers = list(node.get("boilerInfos") or [])
+    for key, value in node.items():
+        if key != "boilerInfos" and isinstance(value, (dict, list)):
+            boilers.extend(_collect_boilers(value))
+    return boilers
+
+
 class ViessmannClient:
     """Async client for Viessmann API."""
 
@@ -37,6 +55,62 @@ class ViessmannClient:
         self._family_id: Optional[str] = None
         self._physics_id: Optional[str] = None
         self._device_info: Dict[str, Any] = {}
+        self._login_lock = asyncio.Lock()
+        # Token lifetime tracking (monotonic seconds)
+        self._token_issued_at: Optional[float] = None
+        self._token_expires_in: Optional[float] = None
+        self._learned_ttl: Optional[float] = None
+        self.proactive_refresh_count = 0
+        self.reactive_refresh_count = 0
+
+    @property
+    def token_age(self) -> Optional[float]:
+        """Seconds since the current token was issued."""
+        if self._token is None or self._token_issued_at is None:
+            return None
+        return time.monotonic() - self._token_issued_at
+
+    @property
+    def token_ttl(self) -> Optional[float]:
+        """Token lifetime from the login response, or learned from a 401."""
+        return self._token_expires_in or self._learned_ttl
+
+    async def refresh_token_if_needed(self, margin: float) -> bool:
+        """Log in again if the token expires within margin seconds."""
+        ttl = self.token_ttl
+        age = self.token_age
+        if ttl is None or ttl <= margin:
+            # Unknown, or too short to refresh ahead of; the 401 path covers it
+            return False
+        if age is None or age < ttl - margin:
+            return False
+
+        _LOGGER.debug(f"Token is {age:.0f}s old (ttl {ttl:.0f}s), refreshing")
+        token = self._token
+        async with self._login_lock:
+            if self._token != token:
+                # Someone else already refreshed it
+                return False
+            await self._login()
+        self.proactive_refresh_count += 1
+        return True
+
+    async def _relogin(self, stale_token: Optional[str]) -> None:
+        """Log in again after a 401, unless another request already did."""
+        async with self._login_lock:
+            if self._token != stale_token:
+                return
+            age = self.token_age
+            if age is not None and self._token_expires_in is None:
+                if age >= TOKEN_MIN_LEARNED_TTL:
+                    # The token was rejected at this age, take it as its lifetime
+                    self._learned_ttl = age
+                    _LOGGER.debug(f"Learned token lifetime: {age:.0f}s")
+                else:
+                    # Too early to be an expiry, e.g. revoked by another login
+                    _LOGGER.debug(f"Ignoring 401 for a token only {age:.0f}s old")
+            await self._login()
+        self.reactive_refresh_count += 1
 
     async def _get_session(self) -> aiohttp.ClientSession:
         """Get or create aiohttp session."""
@@ -66,16 +140,17 @@ class ViessmannClient:
 
         req_params = params.copy() if params else {}
 
-        # Inject token if available
-        if self._token:
-            req_headers["Authorization"] = self._token
+        # Inject token if available (never into the login request itself)
+        token = self._token if endpoint != ENDPOINT_LOGIN else None
+        if token:
+            req_headers["Authorization"] = token
 
             # Special handling for endpoints that require token in specific fields
             # Update authToken if it exists in headers or params
             if "authToken" in req_headers:
-                req_headers["authToken"] = self._token
+                req_headers["authToken"] = token
             if "authToken" in req_params:
-                req_params["authToken"] = self._token
+                req_params["authToken"] = token
 
         try:
             async with session.request(
@@ -89,7 +164,7 @@ class ViessmannClient:
                 if response.status == 401:
                     if retry_auth and endpoint != ENDPOINT_LOGIN:
                         _LOGGER.info("Token expired, logging in again...")
-                        await self.login()
+                        await self._relogin(token)
                         # Retry the request with the new token
                         # The recursive call will pick up the new self._token and update headers/params
                         return await self._request(
@@ -107,13 +182,17 @@ class ViessmannClient:
                     resp_json = await response.json()
                 except Exception:
                     text = await response.text()
-                    _LOGGER.error(f"Failed to parse JSON response from {url}: {text}")
+                    # Callers report the error, only keep the start of the body
+                    _LOGGER.debug(
+                        f"Failed to parse JSON response from {url}: "
+                        f"{text[:MAX_LOGGED_LENGTH]}"
+                    )
                     raise ApiError(f"Invalid JSON response from {url}")
 
                 if resp_json.get("code") != 0:
                     msg = resp_json.get("msg", "Unknown error")
-                    _LOGGER.error(f"API Error {resp_json.get('code')}: {msg}")
-                    raise ApiError(f"API Error: {msg}")
+                    _LOGGER.debug(f"API Error {resp_json.get('code')}: {msg}")
+                    raise ApiError(f"API Error: {msg}", resp_json.get("code"))
 
                 return resp_json
 
@@ -122,9 +201,11 @@ class ViessmannClient:
 
     async def login(self) -> None:
         """Login to get access token."""
-        # Clear existing token before login to avoid sending invalid token in headers
-        self._token = None
+        async with self._login_lock:
+            await self._login()
 
+    async def _login(self) -> None:
+        """Login to get access token, caller must hold the login lock."""
         payload = {"phone": self._username, "password": self._password}
 
         # Login endpoint uses JSON
@@ -135,24 +216,32 @@ class ViessmannClient:
             resp = await self._request(
                 "POST", ENDPOINT_LOGIN, json_data=payload, headers=headers
             )
-
-            # Check if response structure matches expectation
-            # HAR shows: {"msg": "操作成功", "code": 0, "data": {"statusCode": 200, "data": {"access_token": ...}}}
-            data = resp.get("data", {}).get("data", {})
-            self._token = data.get("access_token")
-
-            if not self._token:
-                # Fallback: maybe structure is different or token is in top level data?
-                # Let's print response for debugging if token is missing
-                _LOGGER.warning(f"Login response structure unexpected: {resp}")
-                raise AuthError("Login successful but no token received")
-
+        except AuthError as e:
+            raise InvalidCredentials(f"Login failed: {e}") from e
         except ApiError as e:
-            # If API returns 500, it might be due to wrong password or format
-            # HAR shows 500 for wrong password
-            if "500" in str(e):
-                raise AuthError("Login failed: Invalid credentials or server error")
-            raise AuthError(f"Login failed: {e}")
+            if e.code is None:
+                # No answer from the account service, e.g. a gateway error page
+                raise
+            # HAR shows an error response (500) for a wrong password
+            raise InvalidCredentials(f"Login failed: {e}") from e
+
+        # Check if response structure matches expectation
+        # HAR shows: {"msg": "操作成功", "code": 0, "data": {"statusCode": 200, "data": {"access_token": ...}}}
+        data = resp.get("data", {}).get("data", {})
+        token = data.get("access_token")
+
+        if not token:
+            # Fallback: maybe structure is different or token is in top level data?
+            # Let's print response for debugging if token is missing
+            _LOGGER.warning(f"Login response structure unexpected: {resp}")
+            raise ApiError("Login successful but no token received")
+
+        # Only replace the token once a new one arrived, a failed proactive
+        # refresh keeps the current one, which is still valid
+        self._token = token
+        self._token_issued_at = time.monotonic()
+        expires_in = data.get("expires_in")
+        self._token_expires_in = float(expires_in) if expires_in else None
 
     async def get_user_info(self) -> Dict:
         """Get user info to retrieve user_id."""
@@ -207,12 +296,35 @@ class ViessmannClient:
 
         return data
 
-    async def get_device_detail(self) -> Dict:
-        """Get detailed status of the device."""
+    async def discover_devices(self) -> Dict[str, Dict]:
+        """Walk every family and room and return boiler infos keyed by physicsId."""
+        families = await self.get_family_list()
+
+        devices: Dict[str, Dict] = {}
+        for family in families:
+            payload = {"familyId": str(family.get("familyId"))}
+            resp = await self._request("POST", ENDPOINT_FAMILY_DEVICES, data=payload)
+            for boiler in _collect_boilers(resp.get("data") or {}):
+                if boiler.get("physicsId") is not None:
+                    devices[str(boiler.get("physicsId"))] = boiler
+
+        if devices and self._physics_id not in devices:
+            # Keep a default device for callers that don't pass a physicsId
+            self._physics_id, self._device_info = next(iter(devices.items()))
+
+        return devices
+
+    async def _default_physics_id(self) -> Optional[str]:
+        """Return the default device, discovering it if necessary."""
         if not self._physics_id:
             await self.get_family_devices()
+        return self._physics_id
 
-        payload = {"physicsId": self._physics_id}
+    async def get_device_detail(self, physics_id: Optional[str] = None) -> Dict:
+        """Get detailed status of the device."""
+        physics_id = physics_id or await self._default_physics_id()
+
+        payload = {"physicsId": physics_id}
         resp = await self._request("POST", ENDPOINT_DEVICE_DETAIL, data=payload)
 
         # The response is a list, usually one item
@@ -221,12 +333,11 @@ class ViessmannClient:
             return data[0]
         return {}
 
-    async def get_scan_status(self) -> Dict:
+    async def get_scan_status(self, physics_id: Optional[str] = None) -> Dict:
         """Get scan status of the device."""
-        if not self._physics_id:
-            await self.get_family_devices()
+        physics_id = physics_id or await self._default_physics_id()
 
-        payload = {"physicsId": self._physics_id}
+        payload = {"physicsId": physics_id}
         resp = await self._request("POST", ENDPOINT_SCAN_STATUS, data=payload)
 
         # The response is a list, usually one item
@@ -235,40 +346,38 @@ class ViessmannClient:
             return data[0]
         return {}
 
-    async def set_heating_temp(self, temp: float) -> None:
+    async def set_heating_temp(
+        self, temp: float, physics_id: Optional[str] = None
+    ) -> None:
         """Set central heating temperature."""
-        if not self._physics_id:
-            await self.get_family_devices()
+        physics_id = physics_id or await self._default_physics_id()
 
         # API expects integer string for temperature
-        payload = {"physicsIds": self._physics_id, "temp": str(int(temp))}
+        payload = {"physicsIds": physics_id, "temp": str(int(temp))}
         await self._request("POST", ENDPOINT_SET_CH_TEMP, data=payload)
 
-    async def set_dhw_temp(self, temp: float) -> None:
+    async def set_dhw_temp(self, temp: float, physics_id: Optional[str] = None) -> None:
         """Set domestic hot water temperature."""
-        if not self._physics_id:
-            await self.get_family_devices()
+        physics_id = physics_id or await self._default_physics_id()
 
         # API expects integer string for temperature
-        payload = {"physicsIds": self._physics_id, "temp": str(int(temp))}
+        payload = {"physicsIds": physics_id, "temp": str(int(temp))}
         await self._request("POST", ENDPOINT_SET_DHW_TEMP, data=payload)
 
-    async def set_mode(self, mode: int) -> None:
+    async def set_mode(self, mode: int, physics_id: Optional[str] = None) -> None:
         """Set device mode."""
-        if not self._physics_id:
-            await self.get_family_devices()
+        physics_id = physics_id or await self._default_physics_id()
 
-        payload = {"physicsIds": self._physics_id, "mode": str(mode)}
+        payload = {"physicsIds": physics_id, "mode": str(mode)}
         await self._request("POST", ENDPOINT_SET_MODE, data=payload)
 
-    async def update(self) -> Dict:
+    async def update(self, physics_id: Optional[str] = None) -> Dict:
         """Update all data and return current status."""
         # Ensure we have IDs
-        if not self._physics_id:
-            await self.get_family_devices()
+        physics_id = physics_id or await self._default_physics_id()
 
         # Get detail
-        detail = await self.get_device_detail()
+        detail = await self.get_device_detail(physics_id)
 
         return detail
 
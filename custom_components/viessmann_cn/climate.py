@@ -14,7 +14,8 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.config_entries import ConfigEntry
 
 from .const import DOMAIN
-from .client import ViessmannClient
+from .coordinator import ViessmannCoordinator, ViessmannSnapshot
+from .entity import ViessmannEntity, async_setup_device_entities
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -40,62 +41,63 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the Viessmann climate device."""
-    client = hass.data[DOMAIN][entry.entry_id]
-    async_add_entities([ViessmannClimate(client)], True)
-
-
-class ViessmannClimate(ClimateEntity):
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    async_setup_device_entities(
+        coordinator,
+        entry,
+        "climate",
+        async_add_entities,
+        {
+            "heating": (
+                lambda snapshot: snapshot.has_heating,
+                lambda pid: ViessmannClimate(coordinator, pid),
+            )
+        },
+    )
+
+
+class ViessmannClimate(ViessmannEntity, ClimateEntity):
     """Representation of a Viessmann Climate device."""
 
-    def __init__(self, client: ViessmannClient):
+    def __init__(self, coordinator: ViessmannCoordinator, physics_id: str):
         """Initialize the climate device."""
-        self._client = client
-        self._attr_name = "Viessmann Heating"
-        self._attr_unique_id = f"{client._username}_heating"
+        super().__init__(coordinator, physics_id)
+        self._attr_name = "Heating"
+        self._attr_unique_id = coordinator.unique_id(physics_id, "heating")
         self._attr_temperature_unit = UnitOfTemperature.CELSIUS
         self._attr_hvac_modes = [HVACMode.OFF, HVACMode.HEAT]
         self._attr_supported_features = ClimateEntityFeature.TARGET_TEMPERATURE
         self._attr_target_temperature_step = 1.0
         self._attr_min_temp = 30
         self._attr_max_temp = 80
-        self._status = {}
-        self._scan_status = {}
-
-    async def async_update(self) -> None:
-        """Get the latest data from the device."""
-        try:
-            self._status = await self._client.update()
-            self._scan_status = await self._client.get_scan_status()
-
-            # Update attributes
-            req_data = self._status.get("boilerRequestData", {})
 
-            # Target temperature
-            self._attr_target_temperature = req_data.get("chSet")
+    def _update_from_snapshot(self, snapshot: ViessmannSnapshot) -> None:
+        """Update attributes from the latest snapshot."""
+        req_data = snapshot.request_data
 
-            # Current temperature (using chProbe from scan status)
-            self._attr_current_temperature = self._scan_status.get("chProbe")
+        # Target temperature
+        self._attr_target_temperature = req_data.get("chSet")
 
-            # Min/Max temp
-            if req_data.get("chMin"):
-                self._attr_min_temp = float(req_data.get("chMin"))
-            if req_data.get("chMax"):
-                self._attr_max_temp = float(req_data.get("chMax"))
+        # Current temperature (using chProbe from scan status)
+        self._attr_current_temperature = snapshot.scan_status.get("chProbe")
 
-            # HVAC Mode
-            mode = req_data.get("mode")
-            self._attr_hvac_mode = MODE_TO_HVAC.get(mode, HVACMode.OFF)
+        # Min/Max temp
+        if req_data.get("chMin"):
+            self._attr_min_temp = float(req_data.get("chMin"))
+        if req_data.get("chMax"):
+            self._attr_max_temp = float(req_data.get("chMax"))
 
-            # HVAC Action (Heating or Idle)
-            # fire: 1 means burning
-            is_burning = self._scan_status.get("fire") == 1
-            if self._attr_hvac_mode == HVACMode.HEAT and is_burning:
-                self._attr_hvac_action = "heating"
-            else:
-                self._attr_hvac_action = "idle"
+        # HVAC Mode
+        mode = req_data.get("mode")
+        self._attr_hvac_mode = MODE_TO_HVAC.get(mode, HVACMode.OFF)
 
-        except Exception as e:
-            _LOGGER.error(f"Error updating climate entity: {e}")
+        # HVAC Action (Heating or Idle)
+        # fire: 1 means burning
+        is_burning = snapshot.scan_status.get("fire") == 1
+        if self._attr_hvac_mode == HVACMode.HEAT and is_burning:
+            self._attr_hvac_action = "heating"
+        else:
+            self._attr_hvac_action = "idle"
 
     async def async_set_hvac_mode(self, hvac_mode: HVACMode) -> None:
         """Set new target hvac mode."""
@@ -104,17 +106,15 @@ class ViessmannClimate(ClimateEntity):
             return
 
         viessmann_mode = HVAC_TO_MODE[hvac_mode]
-        await self._client.set_mode(viessmann_mode)
-        # Force update to reflect changes immediately
-        await self.async_update()
-        self.async_write_ha_state()
+        await self._client.set_mode(viessmann_mode, self._physics_id)
+        # Refresh configuration to reflect changes
+        await self.coordinator.async_request_detail_refresh(self._physics_id)
 
     async def async_set_temperature(self, **kwargs: Any) -> None:
         """Set new target temperature."""
         if (temp := kwargs.get(ATTR_TEMPERATURE)) is None:
             return
 
-        await self._client.set_heating_temp(temp)
-        # Force update to reflect changes immediately
-        await self.async_update()
-        self.async_write_ha_state()
+        await self._client.set_heating_temp(temp, self._physics_id)
+        # Refresh configuration to reflect changes
+        await self.coordinator.async_request_detail_refresh(self._physics_id)
@@ -5,11 +5,20 @@ import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_USERNAME, CONF_PASSWORD
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
 
-from .const import DOMAIN
-from .client import ViessmannClient, AuthError
+from .const import (
+    DOMAIN,
+    CONF_STALE_AFTER,
+    DEFAULT_STALE_AFTER,
+    CONF_SCAN_INTERVAL,
+    DEFAULT_SCAN_INTERVAL,
+    CONF_DETAIL_INTERVAL,
+    DEFAULT_DETAIL_INTERVAL,
+)
+from .client import ViessmannClient
+from .exceptions import InvalidCredentials
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -20,6 +29,8 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
     }
 )
 
+STEP_REAUTH_DATA_SCHEMA = vol.Schema({vol.Required(CONF_PASSWORD): str})
+
 
 async def validate_input(hass: HomeAssistant, data: dict) -> dict:
     """Validate the user input allows us to connect."""
@@ -30,7 +41,7 @@ async def validate_input(hass: HomeAssistant, data: dict) -> dict:
         # Get user info to confirm login and get a unique ID if possible
         user_info = await client.get_user_info()
         user_id = user_info.get("userId")
-    except AuthError:
+    except InvalidCredentials:
         raise InvalidAuth
     except Exception as e:
         _LOGGER.exception("Unexpected exception")
@@ -46,6 +57,12 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler()
+
     async def async_step_user(self, user_input=None):
         """Handle the initial step."""
         if user_input is None:
@@ -75,6 +92,66 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
         )
 
+    async def async_step_reauth(self, entry_data):
+        """Handle the account rejecting the stored credentials."""
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(self, user_input=None):
+        """Ask for the new password."""
+        entry = self._get_reauth_entry()
+        errors = {}
+
+        if user_input is not None:
+            data = {**entry.data, CONF_PASSWORD: user_input[CONF_PASSWORD]}
+            try:
+                info = await validate_input(self.hass, data)
+            except CannotConnect:
+                errors["base"] = "cannot_connect"
+            except InvalidAuth:
+                errors["base"] = "invalid_auth"
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Unexpected exception")
+                errors["base"] = "unknown"
+            else:
+                await self.async_set_unique_id(str(info["user_id"]))
+                self._abort_if_unique_id_mismatch()
+                return self.async_update_reload_and_abort(entry, data=data)
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=STEP_REAUTH_DATA_SCHEMA,
+            description_placeholders={"username": entry.data[CONF_USERNAME]},
+            errors=errors,
+        )
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle options for Viessmann CN."""
+
+    async def async_step_init(self, user_input=None):
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        schema = vol.Schema(
+            {
+                vol.Optional(
+                    CONF_SCAN_INTERVAL,
+                    default=options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=10)),
+                vol.Optional(
+                    CONF_DETAIL_INTERVAL,
+                    default=options.get(CONF_DETAIL_INTERVAL, DEFAULT_DETAIL_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=60)),
+                vol.Optional(
+                    CONF_STALE_AFTER,
+                    default=options.get(CONF_STALE_AFTER, DEFAULT_STALE_AFTER),
+                ): vol.All(vol.Coerce(int), vol.Range(min=60)),
+            }
+        )
+        return self.async_show_form(step_id="init", data_schema=schema)
+
 
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
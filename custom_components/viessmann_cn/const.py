@@ -19,6 +19,9 @@ ENDPOINT_SET_CH_TEMP = "/api/3/sendToDevice/setChsetTemp"
 ENDPOINT_SET_DHW_TEMP = "/api/3/sendToDevice/setDhwTemp"
 ENDPOINT_SET_MODE = "/api/3/sendToDevice/setMode"
 
+# Longest response body or error message written to the log
+MAX_LOGGED_LENGTH = 200
+
 # Headers
 DEFAULT_HEADERS = {
     "User-Agent": "FeiSiMan/5.0.5 (iPhone; iOS 26.2.1; Scale/3.00)",
@@ -26,3 +29,31 @@ DEFAULT_HEADERS = {
     "Content-Type": "application/x-www-form-urlencoded;charset=UTF-8",
     "innerKey": "81F862CB8ABBE1FD66E7C452431CE679",
 }
+
+# Polling
+REQUEST_TIMEOUT = 30  # seconds
+DISCOVERY_INTERVAL = 3600  # seconds between device list refreshes
+DISCOVERY_MISSING_PASSES = 3  # remove a device after missing this many in a row
+
+# Events fired on fault and running status changes
+EVENT_FAULT = f"{DOMAIN}_fault"
+EVENT_RUNNING_STATUS = f"{DOMAIN}_running_status_changed"
+
+# Snapshot cache
+STORAGE_VERSION = 1
+STORAGE_SAVE_INTERVAL = 300  # seconds between cache writes
+
+# Token refresh
+TOKEN_CHECK_INTERVAL = 60  # seconds
+TOKEN_REFRESH_MARGIN = 300  # refresh this many seconds before expiry
+# A 401 for a younger token is not taken as its lifetime
+TOKEN_MIN_LEARNED_TTL = 3600  # seconds
+
+# Options
+CONF_STALE_AFTER = "stale_after"
+DEFAULT_STALE_AFTER = 600  # seconds
+# Live telemetry (scanStatus) and configuration (detail) are polled separately
+CONF_SCAN_INTERVAL = "scan_interval"
+DEFAULT_SCAN_INTERVAL = 30  # seconds
+CONF_DETAIL_INTERVAL = "detail_interval"
+DEFAULT_DETAIL_INTERVAL = 600  # seconds
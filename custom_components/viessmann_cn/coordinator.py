@@ -0,0 +1,518 @@
+"""Data update coordinator for Viessmann CN."""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_USERNAME
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .analytics import (
+    HeatingAnalytics,
+    SampleHistory,
+    compute_analytics,
+    history_size,
+)
+from .client import ViessmannClient
+from .const import (
+    DOMAIN,
+    EVENT_FAULT,
+    EVENT_RUNNING_STATUS,
+    REQUEST_TIMEOUT,
+    DISCOVERY_INTERVAL,
+    DISCOVERY_MISSING_PASSES,
+    STORAGE_VERSION,
+    STORAGE_SAVE_INTERVAL,
+)
+from .exceptions import ApiError, InvalidCredentials, ViessmannError
+from .failures import FailureTracker
+
+_LOGGER = logging.getLogger(__name__)
+
+# Live fields whose change makes the detail payload due right away
+DETAIL_TRIGGER_KEYS = ("runningStatus", "fire")
+
+
+@dataclass
+class ViessmannSnapshot:
+    """Last known good state of a device."""
+
+    detail: Dict[str, Any]
+    scan_status: Dict[str, Any]
+    updated_at: datetime
+    detail_updated_at: datetime
+    # Loaded from the cache at startup, not yet replaced by a live refresh
+    restored: bool = False
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ViessmannSnapshot":
+        """Rebuild a cached snapshot, raises ValueError if it is malformed."""
+        updated_at = dt_util.parse_datetime(data["updated_at"])
+        detail_updated_at = dt_util.parse_datetime(data["detail_updated_at"])
+        if updated_at is None or detail_updated_at is None:
+            # parse_datetime returns None rather than raising
+            raise ValueError("Invalid snapshot timestamp")
+        return cls(
+            detail=data["detail"],
+            scan_status=data["scan_status"],
+            updated_at=updated_at,
+            detail_updated_at=detail_updated_at,
+            restored=True,
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the snapshot in a form that can be cached."""
+        return {
+            "detail": self.detail,
+            "scan_status": self.scan_status,
+            "updated_at": self.updated_at.isoformat(),
+            "detail_updated_at": self.detail_updated_at.isoformat(),
+        }
+
+    @property
+    def request_data(self) -> Dict[str, Any]:
+        """Return the boilerRequestData block of the detail payload."""
+        return self.detail.get("boilerRequestData") or {}
+
+    @property
+    def fault(self) -> Any:
+        """Return the fault code from the detail payload."""
+        return self.detail.get("faultStatus") or None
+
+    @property
+    def running_status(self) -> Any:
+        """Return the running status reported by the live tier."""
+        return self.scan_status.get("runningStatus")
+
+    def observed_states(self) -> Dict[str, Any]:
+        """Return the fault and running status, leaving out unreported ones.
+
+        A missing faultStatus or runningStatus, e.g. from an empty payload,
+        is unknown rather than a change; an explicit empty fault is "no fault".
+        """
+        states = {}
+        if "faultStatus" in self.detail:
+            states["fault"] = self.fault
+        if self.running_status is not None:
+            states["running_status"] = self.running_status
+        return states
+
+    @property
+    def has_heating(self) -> bool:
+        """Return True if the device reports a central heating range."""
+        req_data = self.request_data
+        return bool(req_data.get("chMin")) and bool(req_data.get("chMax"))
+
+    @property
+    def has_dhw(self) -> bool:
+        """Return True if the device reports a domestic hot water circuit."""
+        req_data = self.request_data
+        return bool(req_data.get("dhwSet") or req_data.get("dhwMaxSet"))
+
+    def age(self) -> timedelta:
+        """Return how long ago the snapshot was taken."""
+        return dt_util.utcnow() - self.updated_at
+
+
+class ViessmannCoordinator(DataUpdateCoordinator[Dict[str, ViessmannSnapshot]]):
+    """Poll the cloud in the background and serve the last good snapshots.
+
+    Data is keyed by physicsId. The device list itself is rediscovered on a
+    slow interval and only the devices that appeared or disappeared are
+    added or removed. Platforms create entities from each device's
+    capabilities as its snapshots come in.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        client: ViessmannClient,
+        stale_after: timedelta,
+        scan_interval: timedelta,
+        detail_interval: timedelta,
+    ):
+        super().__init__(
+            hass,
+            _LOGGER,
+            config_entry=entry,
+            name=DOMAIN,
+            update_interval=scan_interval,
+        )
+        self.client = client
+        self.stale_after = stale_after
+        self.detail_interval = detail_interval
+        self.devices: Dict[str, Dict[str, Any]] = {}
+        self._discovered_at: Optional[datetime] = None
+        # Consecutive discovery passes each known device has been missing from
+        self._missing: Dict[str, int] = {}
+        # physicsIds are only unique within an account, scope our IDs to it
+        self._account = entry.data[CONF_USERNAME]
+        self._detail_dirty: Set[str] = set()
+        self._store: Store = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}"
+        )
+        self._save_pending = False
+        self.failures = FailureTracker(hass, entry)
+        # Last seen value and when it was first seen, per device and field
+        self._edges: Dict[str, Dict[str, Tuple[Any, datetime]]] = {}
+        self._live = False
+        self.history: Dict[str, SampleHistory] = {}
+        self.analytics: Dict[str, HeatingAnalytics] = {}
+
+    def unique_id(self, physics_id: str, key: str) -> str:
+        """Return the unique ID of a device's entity."""
+        return f"{self._account}_{physics_id}_{key}"
+
+    def device_identifier(self, physics_id: str) -> Tuple[str, str]:
+        """Return the device registry identifier of a device."""
+        return (DOMAIN, f"{self._account}_{physics_id}")
+
+    def snapshot(self, physics_id: str) -> Optional[ViessmannSnapshot]:
+        """Return the last known snapshot of a device."""
+        return (self.data or {}).get(physics_id)
+
+    def _is_fresh(self, snapshot: Optional[ViessmannSnapshot]) -> bool:
+        """Return True if the snapshot is within the staleness limit."""
+        if snapshot is None:
+            return False
+        if snapshot.restored and not self._live:
+            # Serve the cache until the first live refresh has had its go
+            return True
+        return snapshot.age() <= self.stale_after
+
+    async def async_restore(self) -> bool:
+        """Load the cached devices and snapshots, returns False if there are none."""
+        cached = await self._store.async_load()
+        if not cached or not cached.get("snapshots"):
+            return False
+
+        try:
+            data = {
+                physics_id: ViessmannSnapshot.from_dict(snapshot)
+                for physics_id, snapshot in cached["snapshots"].items()
+            }
+        except (KeyError, TypeError, ValueError) as e:
+            _LOGGER.warning(f"Ignoring unreadable snapshot cache: {e}")
+            return False
+
+        self.devices = {
+            physics_id: info
+            for physics_id, info in cached.get("devices", {}).items()
+            if physics_id in data
+        }
+        self.data = data
+        for physics_id, snapshot in data.items():
+            # Changes while Home Assistant was down still fire on the first refresh
+            self._edges[physics_id] = {
+                field: (value, snapshot.updated_at)
+                for field, value in snapshot.observed_states().items()
+            }
+        _LOGGER.debug(f"Restored snapshots of {list(data)}")
+        return True
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Write the snapshots to the cache, at most once per save interval."""
+        if self._save_pending:
+            # The store restarts its timer on every call, which would keep
+            # postponing the write while refreshes come in faster than that
+            return
+        self._save_pending = True
+        # The data is collected when the write happens, so it is never older
+        # than the last refresh
+        self._store.async_delay_save(self._data_to_save, STORAGE_SAVE_INTERVAL)
+
+    async def async_flush_cache(self) -> None:
+        """Write a pending cache save now, e.g. before the entry unloads.
+
+        Saving also cancels the store's delayed write, so nothing writes
+        the cache once the entry is gone.
+        """
+        if self._save_pending:
+            await self._store.async_save(self._data_to_save())
+
+    @callback
+    def _data_to_save(self) -> Dict[str, Any]:
+        """Return the cache contents."""
+        self._save_pending = False
+        data = self.data or {}
+        return {
+            "devices": {pid: info for pid, info in self.devices.items() if pid in data},
+            "snapshots": {pid: snapshot.as_dict() for pid, snapshot in data.items()},
+        }
+
+    def is_stale(self, physics_id: str) -> bool:
+        """Return True if there is no snapshot or it is older than the limit."""
+        return not self._is_fresh(self.snapshot(physics_id))
+
+    async def async_request_detail_refresh(self, physics_id: str) -> None:
+        """Refetch the detail payload on the next refresh, e.g. after a command."""
+        self._detail_dirty.add(physics_id)
+        await self.async_request_refresh()
+
+    async def async_discover_devices(self) -> None:
+        """Diff the family tree against the known devices and apply changes."""
+        devices = await self.client.discover_devices()
+        self._discovered_at = dt_util.utcnow()
+
+        if not devices and self.devices:
+            # An empty tree is far more likely a bad response than every boiler gone
+            raise ApiError("Device discovery returned no devices")
+
+        added = [pid for pid in devices if pid not in self.devices]
+        missing = [pid for pid in self.devices if pid not in devices]
+        for physics_id in devices:
+            self._missing.pop(physics_id, None)
+
+        # Only drop a device once it has been missing from several passes in a row
+        removed = []
+        for physics_id in missing:
+            self._missing[physics_id] = self._missing.get(physics_id, 0) + 1
+            _LOGGER.debug(
+                f"{physics_id} missing from discovery "
+                f"{self._missing[physics_id]} time(s)"
+            )
+            if self._missing[physics_id] >= DISCOVERY_MISSING_PASSES:
+                removed.append(physics_id)
+
+        kept = {pid: self.devices[pid] for pid in missing if pid not in removed}
+        self.devices = {**devices, **kept}
+        if not added and not removed:
+            return
+
+        _LOGGER.info(f"Devices changed, added: {added}, removed: {removed}")
+        if removed:
+            self._async_remove_devices(removed)
+        if added:
+            self._detail_dirty.update(added)
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update entities, then cache the snapshots they were rendered from."""
+        super().async_update_listeners()
+        if self.last_update_success and self.data:
+            self._async_schedule_save()
+
+    @callback
+    def _async_remove_devices(self, removed: List[str]) -> None:
+        """Drop snapshots and registry entries of devices that disappeared."""
+        device_registry = dr.async_get(self.hass)
+        for physics_id in removed:
+            self._missing.pop(physics_id, None)
+            self._detail_dirty.discard(physics_id)
+            self.failures.async_forget(physics_id)
+            self.history.pop(physics_id, None)
+            self._edges.pop(physics_id, None)
+            self.analytics.pop(physics_id, None)
+            if self.data:
+                self.data.pop(physics_id, None)
+            device = device_registry.async_get_device(
+                identifiers={self.device_identifier(physics_id)}
+            )
+            if device:
+                # Removing the device also removes its entities
+                device_registry.async_update_device(
+                    device.id, remove_config_entry_id=self.config_entry.entry_id
+                )
+
+    def _record_sample(self, physics_id: str, snapshot: ViessmannSnapshot) -> None:
+        """Append a new sample to the device history and refresh its analytics."""
+        history = self.history.get(physics_id)
+        if history is None:
+            history = self.history[physics_id] = SampleHistory(
+                history_size(self.update_interval.total_seconds())
+            )
+        if not history.append(snapshot.updated_at.timestamp(), snapshot.scan_status):
+            # Same snapshot served again after a failed refresh
+            return
+
+        req_data = snapshot.request_data
+        analytics = compute_analytics(
+            history, req_data.get("chSet"), req_data.get("dhwSet")
+        )
+        if analytics is not None:
+            self.analytics[physics_id] = analytics
+
+    @callback
+    def _async_detect_edges(self, physics_id: str, snapshot: ViessmannSnapshot) -> None:
+        """Fire events when the fault or running status of a device changes."""
+        edges = self._edges.setdefault(physics_id, {})
+        for field, value in snapshot.observed_states().items():
+            previous = edges.get(field)
+            if previous is not None and previous[0] == value:
+                continue
+            edges[field] = (value, snapshot.updated_at)
+            if previous is None:
+                # First observation, nothing changed
+                continue
+
+            previous_value, previous_since = previous
+            if field == "fault":
+                if previous_value is None:
+                    change = "fault_raised"
+                elif value is None:
+                    change = "fault_cleared"
+                else:
+                    change = "fault_changed"
+                event_type = EVENT_FAULT
+            else:
+                change = "running_status_changed"
+                event_type = EVENT_RUNNING_STATUS
+
+            self._async_fire_event(
+                event_type,
+                physics_id,
+                {
+                    "type": change,
+                    field: value,
+                    f"previous_{field}": previous_value,
+                    "timestamp": snapshot.updated_at.isoformat(),
+                    "previous_since": previous_since.isoformat(),
+                },
+            )
+
+    @callback
+    def _async_fire_event(
+        self, event_type: str, physics_id: str, data: Dict[str, Any]
+    ) -> None:
+        """Fire an event for a device."""
+        device = dr.async_get(self.hass).async_get_device(
+            identifiers={self.device_identifier(physics_id)}
+        )
+        _LOGGER.debug(f"{physics_id}: {data['type']}")
+        self.hass.bus.async_fire(
+            event_type,
+            {
+                "device_id": device.id if device else None,
+                "physics_id": physics_id,
+                **data,
+            },
+        )
+
+    def _discovery_due(self) -> bool:
+        """Return True if the device list should be rediscovered."""
+        if self._discovered_at is None:
+            return True
+        return dt_util.utcnow() - self._discovered_at >= timedelta(
+            seconds=DISCOVERY_INTERVAL
+        )
+
+    def _detail_due(self, physics_id: str) -> bool:
+        """Return True if the configuration tier needs to be refetched."""
+        previous = self.snapshot(physics_id)
+        if physics_id in self._detail_dirty or previous is None:
+            return True
+        return dt_util.utcnow() - previous.detail_updated_at >= self.detail_interval
+
+    async def _fetch_detail(self, physics_id: str) -> tuple[Dict[str, Any], datetime]:
+        """Return the detail payload, refetching it only when due."""
+        previous = self.snapshot(physics_id)
+        if not self._detail_due(physics_id):
+            return previous.detail, previous.detail_updated_at
+
+        # Clear the flag up front so a command issued mid-fetch marks it again
+        self._detail_dirty.discard(physics_id)
+        try:
+            detail = await self.client.get_device_detail(physics_id)
+        except asyncio.CancelledError:
+            # Timed out, retry on the next cycle
+            self._detail_dirty.add(physics_id)
+            raise
+        except ViessmannError as e:
+            self._detail_dirty.add(physics_id)
+            if previous is None or isinstance(e, InvalidCredentials):
+                raise
+            # Configuration rarely changes, keep the previous one and retry next cycle
+            self.failures.record_failure("Detail refresh", e, physics_id)
+            return previous.detail, previous.detail_updated_at
+
+        self.failures.record_success("Detail refresh", physics_id)
+        return detail, dt_util.utcnow()
+
+    async def _async_update_device(self, physics_id: str) -> ViessmannSnapshot:
+        """Fetch a fresh snapshot, or fall back to the last one while it is fresh."""
+        previous = self.snapshot(physics_id)
+        try:
+            async with asyncio.timeout(REQUEST_TIMEOUT):
+                scan_status = await self.client.get_scan_status(physics_id)
+                if previous is not None and any(
+                    scan_status.get(key) is not None
+                    and scan_status.get(key) != previous.scan_status.get(key)
+                    for key in DETAIL_TRIGGER_KEYS
+                ):
+                    # faultStatus only comes with detail, and a fault shows up
+                    # as a change in burner or running state, so fetch it now
+                    self._detail_dirty.add(physics_id)
+                detail, detail_updated_at = await self._fetch_detail(physics_id)
+        except (ViessmannError, asyncio.TimeoutError) as e:
+            self.failures.record_failure("Refresh", e, physics_id)
+            if self._is_fresh(previous) and not isinstance(e, InvalidCredentials):
+                # Keep serving the previous snapshot so entities don't flap
+                return previous
+            raise
+
+        self.failures.record_success("Refresh", physics_id)
+        return ViessmannSnapshot(
+            detail=detail,
+            scan_status=scan_status,
+            updated_at=dt_util.utcnow(),
+            detail_updated_at=detail_updated_at,
+        )
+
+    async def _async_update_data(self) -> Dict[str, ViessmannSnapshot]:
+        """Refresh every known device, rediscovering them when due."""
+        try:
+            return await self._async_update_devices()
+        finally:
+            self._live = True
+
+    async def _async_update_devices(self) -> Dict[str, ViessmannSnapshot]:
+        """Refresh every known device."""
+        if self._discovery_due():
+            try:
+                async with asyncio.timeout(REQUEST_TIMEOUT):
+                    await self.async_discover_devices()
+            except InvalidCredentials as e:
+                self.failures.record_failure("Device discovery", e)
+                raise ConfigEntryAuthFailed(str(e)) from e
+            except (ViessmannError, asyncio.TimeoutError) as e:
+                # Keep the known devices and try again next cycle
+                self.failures.record_failure("Device discovery", e)
+            else:
+                self.failures.record_success("Device discovery")
+
+        physics_ids = list(self.devices)
+        results = await asyncio.gather(
+            *(self._async_update_device(pid) for pid in physics_ids),
+            return_exceptions=True,
+        )
+
+        data: Dict[str, ViessmannSnapshot] = {}
+        errors: List[BaseException] = []
+        for physics_id, result in zip(physics_ids, results):
+            if isinstance(result, InvalidCredentials):
+                # Credentials were rejected, retrying won't help until reauth
+                raise ConfigEntryAuthFailed(str(result)) from result
+            if isinstance(result, (ViessmannError, asyncio.TimeoutError)):
+                # Already recorded by the failure tracker
+                errors.append(result)
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                data[physics_id] = result
+                self._record_sample(physics_id, result)
+                self._async_detect_edges(physics_id, result)
+
+        if errors and not data:
+            raise UpdateFailed(f"Error communicating with API: {errors[0]}")
+
+        return data
@@ -0,0 +1,113 @@
+"""Base entity for Viessmann CN."""
+
+from typing import Callable, Dict, Set, Tuple
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .coordinator import ViessmannCoordinator, ViessmannSnapshot
+
+# Entity key -> (whether a snapshot supports it, factory taking the physicsId)
+EntitySpecs = Dict[
+    str, Tuple[Callable[[ViessmannSnapshot], bool], Callable[[str], Entity]]
+]
+
+
+@callback
+def async_setup_device_entities(
+    coordinator: ViessmannCoordinator,
+    entry: ConfigEntry,
+    platform: str,
+    async_add_entities: AddEntitiesCallback,
+    specs: EntitySpecs,
+) -> None:
+    """Add a platform's per-device entities as device capabilities show up.
+
+    Runs on every coordinator update, so devices discovered later and
+    capabilities that only show up in a later snapshot get their entities.
+    Registry entries of capabilities a device lacks are only removed here at
+    setup, so one partial payload can't drop an entity the user customised.
+    """
+    entity_registry = er.async_get(coordinator.hass)
+    for physics_id, snapshot in (coordinator.data or {}).items():
+        if not snapshot.request_data:
+            # No configuration yet, the capabilities are unknown
+            continue
+        for key, (exists_fn, _) in specs.items():
+            if exists_fn(snapshot):
+                continue
+            entity_id = entity_registry.async_get_entity_id(
+                platform, DOMAIN, coordinator.unique_id(physics_id, key)
+            )
+            if entity_id:
+                entity_registry.async_remove(entity_id)
+
+    added: Set[Tuple[str, str]] = set()
+
+    @callback
+    def _async_sync_entities() -> None:
+        # Entities of removed devices go away with their registry device
+        added.intersection_update(
+            (pid, key) for pid, key in added if pid in coordinator.devices
+        )
+
+        new_entities = []
+        for physics_id, snapshot in (coordinator.data or {}).items():
+            for key, (exists_fn, factory) in specs.items():
+                if (physics_id, key) not in added and exists_fn(snapshot):
+                    added.add((physics_id, key))
+                    new_entities.append(factory(physics_id))
+
+        if new_entities:
+            async_add_entities(new_entities)
+
+    _async_sync_entities()
+    entry.async_on_unload(coordinator.async_add_listener(_async_sync_entities))
+
+
+class ViessmannEntity(CoordinatorEntity[ViessmannCoordinator]):
+    """Entity that renders the coordinator's last known snapshot of a device."""
+
+    # Named relative to the device, so entities of several boilers differ
+    _attr_has_entity_name = True
+
+    def __init__(self, coordinator: ViessmannCoordinator, physics_id: str):
+        """Initialize the entity."""
+        super().__init__(coordinator)
+        self._client = coordinator.client
+        self._physics_id = physics_id
+
+        info = coordinator.devices.get(physics_id, {})
+        self._attr_device_info = DeviceInfo(
+            identifiers={coordinator.device_identifier(physics_id)},
+            manufacturer="Viessmann",
+            name=info.get("deviceName") or f"Viessmann {physics_id}",
+            serial_number=physics_id,
+        )
+
+    @property
+    def available(self) -> bool:
+        """Return True until the snapshot exceeds the staleness limit."""
+        return super().available and not self.coordinator.is_stale(self._physics_id)
+
+    async def async_added_to_hass(self) -> None:
+        """Render the current snapshot as soon as the entity is added."""
+        await super().async_added_to_hass()
+        if (snapshot := self.coordinator.snapshot(self._physics_id)) is not None:
+            self._update_from_snapshot(snapshot)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle a new snapshot from the coordinator."""
+        if (snapshot := self.coordinator.snapshot(self._physics_id)) is not None:
+            self._update_from_snapshot(snapshot)
+        super()._handle_coordinator_update()
+
+    def _update_from_snapshot(self, snapshot: ViessmannSnapshot) -> None:
+        """Update entity attributes from a snapshot, overridden by platforms."""
@@ -1,5 +1,7 @@
 """Exceptions for Viessmann API."""
 
+from typing import Any
+
 
 class ViessmannError(Exception):
     """Base exception for Viessmann API."""
@@ -9,9 +11,18 @@ class AuthError(ViessmannError):
     """Authentication failed."""
 
 
+class InvalidCredentials(AuthError):
+    """The account service rejected the username or password."""
+
+
 class NetworkError(ViessmannError):
     """Network communication error."""
 
 
 class ApiError(ViessmannError):
     """API returned an error."""
+
+    def __init__(self, message: str, code: Any = None):
+        super().__init__(message)
+        # The code of an API error response, None if there was no valid response
+        self.code = code
@@ -0,0 +1,189 @@
+"""Rate-limited failure logging and repair issues for Viessmann CN."""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Set
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import issue_registry as ir
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, MAX_LOGGED_LENGTH
+
+_LOGGER = logging.getLogger(__name__)
+
+# Repeated failures are summarised at most this often
+SUMMARY_INTERVAL = timedelta(minutes=15)
+# Raise a repair issue once something has been failing for this long
+ISSUE_AFTER = timedelta(minutes=30)
+
+
+def truncate(text: str, limit: int = MAX_LOGGED_LENGTH) -> str:
+    """Shorten text for logging."""
+    text = str(text)
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... ({len(text)} chars)"
+
+
+@dataclass
+class _Failure:
+    """State of one failing operation, across the devices it fails for."""
+
+    since: datetime
+    logged_at: datetime
+    count: int = 1
+    suppressed: int = 0
+    last_error: str = ""
+    devices: Set[str] = field(default_factory=set)
+
+    def describe(self, operation: str) -> str:
+        """Return the operation and the devices it fails for."""
+        if not self.devices:
+            return operation
+        if len(self.devices) == 1:
+            return f"{operation} of {next(iter(self.devices))}"
+        return f"{operation} of {len(self.devices)} devices"
+
+
+class FailureTracker:
+    """Log the first failure and the recovery once, summarise repeats.
+
+    Each failing operation is tracked under its own key, e.g. the refresh
+    of devices. Failures of the same operation on several devices are
+    grouped, so a cloud outage logs once rather than once per device.
+    While any operation has been failing for longer than ISSUE_AFTER, a
+    repair issue is shown for the config entry.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry):
+        self._hass = hass
+        self._entry = entry
+        self._failures: Dict[str, _Failure] = {}
+        self._issue_id = f"cloud_unreachable_{entry.entry_id}"
+        # The issue registry is persistent, drop one left over from a previous run
+        ir.async_delete_issue(hass, DOMAIN, self._issue_id)
+        self._issue_raised = False
+        self._issue_updated_at: Optional[datetime] = None
+
+    @property
+    def failing(self) -> Dict[str, int]:
+        """Return the failure count of every failing operation."""
+        return {key: failure.count for key, failure in self._failures.items()}
+
+    @callback
+    def record_failure(
+        self, key: str, error: Exception, device: Optional[str] = None
+    ) -> None:
+        """Record a failure of the operation, on a device if it has one."""
+        now = dt_util.utcnow()
+        message = truncate(str(error) or type(error).__name__)
+        failure = self._failures.get(key)
+        first = failure is None
+        if first:
+            failure = self._failures[key] = _Failure(
+                since=now, logged_at=now, count=0
+            )
+        if device is not None:
+            # Other devices joining a failing operation are only counted
+            failure.devices.add(device)
+        failure.count += 1
+        failure.last_error = message
+
+        if first:
+            _LOGGER.warning(f"{failure.describe(key)} failed: {message}")
+        elif now - failure.logged_at >= SUMMARY_INTERVAL:
+            _LOGGER.warning(
+                f"{failure.describe(key)} still failing: {failure.count} "
+                f"failures since {failure.since}, {failure.suppressed} not "
+                f"logged, last error: {message}"
+            )
+            failure.logged_at = now
+            failure.suppressed = 0
+        else:
+            failure.suppressed += 1
+            _LOGGER.debug(f"{failure.describe(key)} failed again: {message}")
+
+        self._async_update_issue()
+
+    @callback
+    def record_success(self, key: str, device: Optional[str] = None) -> None:
+        """Record that the operation succeeded, on a device if it has one."""
+        failure = self._failures.get(key)
+        if failure is None:
+            return
+        if device is not None:
+            failure.devices.discard(device)
+            if failure.devices:
+                # Still failing on other devices
+                _LOGGER.debug(f"{key} of {device} recovered")
+                return
+
+        del self._failures[key]
+        _LOGGER.info(
+            f"{key} recovered after {failure.count} failures since {failure.since}"
+        )
+        self._async_update_issue()
+
+    @callback
+    def async_forget(self, device: str) -> None:
+        """Drop the failures of a device that no longer exists."""
+        changed = False
+        for key, failure in list(self._failures.items()):
+            if device not in failure.devices:
+                continue
+            failure.devices.discard(device)
+            if not failure.devices:
+                del self._failures[key]
+            changed = True
+        if changed:
+            self._async_update_issue()
+
+    @callback
+    def _async_update_issue(self) -> None:
+        """Raise or clear the repair issue."""
+        now = dt_util.utcnow()
+        longest = max(
+            self._failures.items(),
+            key=lambda item: now - item[1].since,
+            default=None,
+        )
+
+        if longest is None or now - longest[1].since < ISSUE_AFTER:
+            if self._issue_raised:
+                ir.async_delete_issue(self._hass, DOMAIN, self._issue_id)
+                self._issue_raised = False
+            return
+
+        if self._issue_raised and now - self._issue_updated_at < SUMMARY_INTERVAL:
+            # Raised already, only refresh its counters every so often
+            return
+
+        key, failure = longest
+        ir.async_create_issue(
+            self._hass,
+            DOMAIN,
+            self._issue_id,
+            is_fixable=False,
+            severity=ir.IssueSeverity.WARNING,
+            translation_key="cloud_unreachable",
+            translation_placeholders={
+                "title": self._entry.title,
+                "operation": failure.describe(key),
+                "since": failure.since.isoformat(timespec="seconds"),
+                "count": str(failure.count),
+                "error": failure.last_error,
+            },
+        )
+        self._issue_raised = True
+        self._issue_updated_at = now
+
+    @callback
+    def async_clear(self) -> None:
+        """Drop all state and the repair issue, e.g. when the entry unloads."""
+        self._failures.clear()
+        if self._issue_raised:
+            ir.async_delete_issue(self._hass, DOMAIN, self._issue_id)
+            self._issue_raised = False
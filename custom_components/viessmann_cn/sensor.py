@@ -1,23 +1,94 @@
 """Sensor platform for Viessmann CN."""
 
 import logging
-from typing import Any, List, Optional
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, List, Optional
 
 from homeassistant.components.sensor import (
     SensorEntity,
+    SensorEntityDescription,
     SensorDeviceClass,
     SensorStateClass,
 )
-from homeassistant.const import UnitOfTemperature, PERCENTAGE
+from homeassistant.const import UnitOfTemperature, UnitOfTime, PERCENTAGE
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers.entity import EntityCategory
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
+from .analytics import HeatingAnalytics
 from .const import DOMAIN
-from .client import ViessmannClient
+from .coordinator import ViessmannCoordinator, ViessmannSnapshot
+from .entity import ViessmannEntity, async_setup_device_entities
 
 _LOGGER = logging.getLogger(__name__)
 
+RATE_UNIT = f"{UnitOfTemperature.CELSIUS}/min"
+
+
+@dataclass(frozen=True, kw_only=True)
+class ViessmannAnalyticsSensorDescription(SensorEntityDescription):
+    """Describes a sensor derived from the sample history."""
+
+    value_fn: Callable[[HeatingAnalytics], Any]
+    exists_fn: Callable[[ViessmannSnapshot], bool] = lambda snapshot: True
+
+
+ANALYTICS_SENSORS = (
+    ViessmannAnalyticsSensorDescription(
+        key="ch_heat_up_rate",
+        name="Heating Rate",
+        native_unit_of_measurement=RATE_UNIT,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=2,
+        value_fn=lambda a: a.ch_rate,
+        exists_fn=lambda snapshot: snapshot.has_heating,
+    ),
+    ViessmannAnalyticsSensorDescription(
+        key="dhw_heat_up_rate",
+        name="Hot Water Rate",
+        native_unit_of_measurement=RATE_UNIT,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=2,
+        value_fn=lambda a: a.dhw_rate,
+        exists_fn=lambda snapshot: snapshot.has_dhw,
+    ),
+    ViessmannAnalyticsSensorDescription(
+        key="ch_time_to_target",
+        name="Heating Time to Target",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        suggested_display_precision=0,
+        value_fn=lambda a: a.ch_time_to_target,
+        exists_fn=lambda snapshot: snapshot.has_heating,
+    ),
+    ViessmannAnalyticsSensorDescription(
+        key="dhw_time_to_target",
+        name="Hot Water Time to Target",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        suggested_display_precision=0,
+        value_fn=lambda a: a.dhw_time_to_target,
+        exists_fn=lambda snapshot: snapshot.has_dhw,
+    ),
+    ViessmannAnalyticsSensorDescription(
+        key="burner_duty_cycle",
+        name="Burner Duty Cycle",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        value_fn=lambda a: a.duty_cycle,
+    ),
+    ViessmannAnalyticsSensorDescription(
+        key="short_cycles",
+        name="Short Cycles",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda a: a.short_cycles,
+    ),
+)
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -25,46 +96,119 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the Viessmann sensor device."""
-    client = hass.data[DOMAIN][entry.entry_id]
-    async_add_entities([ViessmannSensor(client)], True)
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    async_add_entities([ViessmannTokenSensor(coordinator)])
+
+    specs = {
+        "status": (
+            lambda snapshot: True,
+            lambda pid: ViessmannSensor(coordinator, pid),
+        )
+    }
+    for description in ANALYTICS_SENSORS:
+        specs[description.key] = (
+            description.exists_fn,
+            partial(ViessmannAnalyticsSensor, coordinator, description=description),
+        )
+    async_setup_device_entities(
+        coordinator, entry, "sensor", async_add_entities, specs
+    )
 
 
-class ViessmannSensor(SensorEntity):
+class ViessmannSensor(ViessmannEntity, SensorEntity):
     """Representation of a Viessmann Sensor device."""
 
-    def __init__(self, client: ViessmannClient):
+    def __init__(self, coordinator: ViessmannCoordinator, physics_id: str):
         """Initialize the sensor device."""
-        self._client = client
-        self._attr_name = "Viessmann Status"
-        self._attr_unique_id = f"{client._username}_status"
+        super().__init__(coordinator, physics_id)
+        self._attr_name = "Status"
+        self._attr_unique_id = coordinator.unique_id(physics_id, "status")
         self._attr_device_class = SensorDeviceClass.ENUM
-        self._status = {}
-        self._scan_status = {}
-
-    async def async_update(self) -> None:
-        """Get the latest data from the device."""
-        try:
-            self._status = await self._client.update()
-            self._scan_status = await self._client.get_scan_status()
-
-            # Update attributes
-            # Fault status
-            fault = self._status.get("faultStatus")
-            if fault:
-                self._attr_native_value = f"Fault: {fault}"
-            else:
-                self._attr_native_value = "Normal"
-
-            # Additional attributes
+
+    def _update_from_snapshot(self, snapshot: ViessmannSnapshot) -> None:
+        """Update attributes from the latest snapshot."""
+        scan_status = snapshot.scan_status
+
+        # Fault status
+        fault = snapshot.fault
+        if fault:
+            self._attr_native_value = f"Fault: {fault}"
+        else:
+            self._attr_native_value = "Normal"
+
+        # Additional attributes
+        self._attr_extra_state_attributes = {
+            "fire": scan_status.get("fire"),
+            "running_status": scan_status.get("runningStatus"),
+            "sys_pattern": scan_status.get("sysPattern"),
+            "mode_name": scan_status.get("modeName"),
+            "wifi_firmware": scan_status.get("wifiFirmwareVersion"),
+            "ch_probe": scan_status.get("chProbe"),
+            "dhw_probe": scan_status.get("dhwProbe"),
+            "snapshot_time": snapshot.updated_at.isoformat(),
+            "detail_time": snapshot.detail_updated_at.isoformat(),
+            "restored": snapshot.restored,
+        }
+
+
+class ViessmannAnalyticsSensor(ViessmannEntity, SensorEntity):
+    """Sensor derived from the device's recent sample history."""
+
+    entity_description: ViessmannAnalyticsSensorDescription
+
+    def __init__(
+        self,
+        coordinator: ViessmannCoordinator,
+        physics_id: str,
+        description: ViessmannAnalyticsSensorDescription,
+    ):
+        """Initialize the analytics sensor."""
+        super().__init__(coordinator, physics_id)
+        self.entity_description = description
+        self._attr_unique_id = coordinator.unique_id(physics_id, description.key)
+
+    @property
+    def available(self) -> bool:
+        """Return True once there is enough history to derive a value."""
+        return super().available and self._physics_id in self.coordinator.analytics
+
+    def _update_from_snapshot(self, snapshot: ViessmannSnapshot) -> None:
+        """Update the value from the latest analytics."""
+        analytics = self.coordinator.analytics.get(self._physics_id)
+        if analytics is None:
+            return
+        self._attr_native_value = self.entity_description.value_fn(analytics)
+        if self.entity_description.key == "short_cycles":
             self._attr_extra_state_attributes = {
-                "fire": self._scan_status.get("fire"),
-                "running_status": self._scan_status.get("runningStatus"),
-                "sys_pattern": self._scan_status.get("sysPattern"),
-                "mode_name": self._scan_status.get("modeName"),
-                "wifi_firmware": self._scan_status.get("wifiFirmwareVersion"),
-                "ch_probe": self._scan_status.get("chProbe"),
-                "dhw_probe": self._scan_status.get("dhwProbe"),
+                "short_cycling": analytics.short_cycling
             }
 
-        except Exception as e:
-            _LOGGER.error(f"Error updating sensor entity: {e}")
+
+class ViessmannTokenSensor(CoordinatorEntity[ViessmannCoordinator], SensorEntity):
+    """Age and refresh counters of the account's API token, for monitoring."""
+
+    def __init__(self, coordinator: ViessmannCoordinator):
+        """Initialize the token sensor."""
+        super().__init__(coordinator)
+        self._client = coordinator.client
+        self._attr_name = "Viessmann Token Age"
+        self._attr_unique_id = f"{self._client._username}_token_age"
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+        self._attr_device_class = SensorDeviceClass.DURATION
+        self._attr_native_unit_of_measurement = UnitOfTime.SECONDS
+
+    @property
+    def native_value(self) -> Optional[int]:
+        """Return the token age in seconds."""
+        age = self._client.token_age
+        return round(age) if age is not None else None
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return the token lifetime and refresh counters."""
+        ttl = self._client.token_ttl
+        return {
+            "token_ttl": round(ttl) if ttl is not None else None,
+            "proactive_refresh_count": self._client.proactive_refresh_count,
+            "reactive_refresh_count": self._client.reactive_refresh_count,
+        }
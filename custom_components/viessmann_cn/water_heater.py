@@ -13,7 +13,8 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.config_entries import ConfigEntry
 
 from .const import DOMAIN
-from .client import ViessmannClient
+from .coordinator import ViessmannCoordinator, ViessmannSnapshot
+from .entity import ViessmannEntity, async_setup_device_entities
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -24,65 +25,65 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the Viessmann water heater device."""
-    client = hass.data[DOMAIN][entry.entry_id]
-    async_add_entities([ViessmannWaterHeater(client)], True)
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    async_setup_device_entities(
+        coordinator,
+        entry,
+        "water_heater",
+        async_add_entities,
+        {
+            "dhw": (
+                lambda snapshot: snapshot.has_dhw,
+                lambda pid: ViessmannWaterHeater(coordinator, pid),
+            )
+        },
+    )
 
 
-class ViessmannWaterHeater(WaterHeaterEntity):
+class ViessmannWaterHeater(ViessmannEntity, WaterHeaterEntity):
     """Representation of a Viessmann Water Heater device."""
 
-    def __init__(self, client: ViessmannClient):
+    def __init__(self, coordinator: ViessmannCoordinator, physics_id: str):
         """Initialize the water heater device."""
-        self._client = client
-        self._attr_name = "Viessmann Hot Water"
-        self._attr_unique_id = f"{client._username}_dhw"
+        super().__init__(coordinator, physics_id)
+        self._attr_name = "Hot Water"
+        self._attr_unique_id = coordinator.unique_id(physics_id, "dhw")
         self._attr_temperature_unit = UnitOfTemperature.CELSIUS
         self._attr_supported_features = WaterHeaterEntityFeature.TARGET_TEMPERATURE
         self._attr_target_temperature_step = 1.0
         self._attr_min_temp = 30
         self._attr_max_temp = 60
-        self._status = {}
-        self._scan_status = {}
-
-    async def async_update(self) -> None:
-        """Get the latest data from the device."""
-        try:
-            self._status = await self._client.update()
-            self._scan_status = await self._client.get_scan_status()
-
-            # Update attributes
-            req_data = self._status.get("boilerRequestData", {})
-
-            # Target temperature
-            self._attr_target_temperature = req_data.get("dhwSet")
-
-            # Current temperature (using dhwProbe from scan status)
-            self._attr_current_temperature = self._scan_status.get("dhwProbe")
-
-            # Min/Max temp
-            if req_data.get("dhwMinSet"):
-                self._attr_min_temp = float(req_data.get("dhwMinSet"))
-            if req_data.get("dhwMaxSet"):
-                self._attr_max_temp = float(req_data.get("dhwMaxSet"))
-
-            # Operation mode (always on for DHW usually, or based on main mode)
-            # We can just say "gas" or "eco" etc, but for now let's keep it simple
-            self._attr_current_operation = (
-                "heating" if self._scan_status.get("fire") == 1 else "idle"
-            )
 
-        except Exception as e:
-            _LOGGER.error(f"Error updating water heater entity: {e}")
+    def _update_from_snapshot(self, snapshot: ViessmannSnapshot) -> None:
+        """Update attributes from the latest snapshot."""
+        req_data = snapshot.request_data
+
+        # Target temperature
+        self._attr_target_temperature = req_data.get("dhwSet")
+
+        # Current temperature (using dhwProbe from scan status)
+        self._attr_current_temperature = snapshot.scan_status.get("dhwProbe")
+
+        # Min/Max temp
+        if req_data.get("dhwMinSet"):
+            self._attr_min_temp = float(req_data.get("dhwMinSet"))
+        if req_data.get("dhwMaxSet"):
+            self._attr_max_temp = float(req_data.get("dhwMaxSet"))
+
+        # Operation mode (always on for DHW usually, or based on main mode)
+        # We can just say "gas" or "eco" etc, but for now let's keep it simple
+        self._attr_current_operation = (
+            "heating" if snapshot.scan_status.get("fire") == 1 else "idle"
+        )
 
     async def async_set_temperature(self, **kwargs: Any) -> None:
         """Set new target temperature."""
         if (temp := kwargs.get(ATTR_TEMPERATURE)) is None:
             return
 
-        await self._client.set_dhw_temp(temp)
-        # Force update to reflect changes immediately
-        await self.async_update()
-        self.async_write_ha_state()
+        await self._client.set_dhw_temp(temp, self._physics_id)
+        # Refresh configuration to reflect changes
+        await self.coordinator.async_request_detail_refresh(self._physics_id)
 
     async def async_set_operation_mode(self, operation_mode: str) -> None:
         """Set operation mode."""
@@ -0,0 +1,98 @@
+"""Tests for the heating analytics."""
+
+import importlib.util
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Load the module on its own, the package itself needs Home Assistant
+_SPEC = importlib.util.spec_from_file_location(
+    "viessmann_cn_analytics",
+    Path(__file__).parents[1] / "custom_components" / "viessmann_cn" / "analytics.py",
+)
+analytics = importlib.util.module_from_spec(_SPEC)
+_SPEC.loader.exec_module(analytics)
+
+
+def _history(ts, ch, fire, size=None):
+    history = analytics.SampleHistory(size or len(ts))
+    for t, c, f in zip(ts, ch, fire):
+        history.append(t, {"chProbe": c, "fire": f})
+    return history
+
+
+def test_history_wraps_oldest_first():
+    history = analytics.SampleHistory(3)
+    for t in range(5):
+        assert history.append(t, {"chProbe": t * 10, "fire": 1})
+
+    ts, ch, dhw, fire = history.arrays()
+    assert len(history) == 3
+    assert ts.tolist() == [2, 3, 4]
+    assert ch.tolist() == [20, 30, 40]
+    assert np.isnan(dhw).all()
+    assert fire.tolist() == [1, 1, 1]
+
+
+def test_history_rejects_old_samples():
+    history = analytics.SampleHistory(3)
+    assert history.append(10, {})
+    assert not history.append(10, {})
+    assert not history.append(5, {})
+    assert len(history) == 1
+
+
+def test_history_size_covers_window():
+    size = analytics.history_size(30)
+    assert size * 30 > analytics.ANALYTICS_WINDOW
+
+
+@pytest.mark.parametrize(
+    ("fire", "expected"),
+    [
+        # Burner never stops
+        ([1, 1, 1, 1], 0),
+        # Run in progress at the window start has an unknown length
+        ([1, 1, 0, 0, 1, 0], 1),
+        # Run still going at the window end isn't completed yet
+        ([0, 1, 0, 1, 1], 1),
+        ([0, 1, 1, 1], 0),
+        ([0, 0, 0, 0], 0),
+    ],
+)
+def test_short_cycles(fire, expected):
+    ts = np.arange(len(fire), dtype=float) * 60
+    assert analytics._short_cycles(ts, np.array(fire, dtype=float)) == expected
+
+
+def test_short_cycles_ignores_long_runs():
+    ts = np.array([0, 60, 60 + analytics.SHORT_CYCLE_MIN_RUN, 1000], dtype=float)
+    fire = np.array([0, 1, 0, 0], dtype=float)
+    assert analytics._short_cycles(ts, fire) == 0
+
+
+def test_rate_only_counts_burner_runs():
+    # Heats 40 -> 43 °C at 1 °C/min, then cools back over six minutes
+    ts = np.arange(0, analytics.ANALYTICS_WINDOW + 1, 30, dtype=float)
+    phase = ts % 540
+    fire = (phase < 180).astype(float)
+    ch = np.where(fire == 1, 40 + phase / 60, 43 - (phase - 180) / 120)
+
+    result = analytics.compute_analytics(_history(ts, ch, fire), 60, None)
+
+    assert result.ch_rate == pytest.approx(1.0)
+    assert result.ch_time_to_target == pytest.approx(60 - ch[-1])
+    assert result.dhw_rate is None
+
+
+def test_rate_needs_the_burner_on():
+    ts = np.arange(0, 600, 30, dtype=float)
+    ch = 50 - ts / 600
+    fire = np.zeros_like(ts)
+
+    result = analytics.compute_analytics(_history(ts, ch, fire), 60, None)
+
+    assert result.ch_rate is None
+    assert result.ch_time_to_target is None
+    assert result.duty_cycle == 0
@@ -0,0 +1,127 @@
+"""Tests for the token handling of the API client."""
+
+import asyncio
+import time
+
+import pytest
+
+from custom_components.viessmann_cn.client import ViessmannClient
+from custom_components.viessmann_cn.const import TOKEN_MIN_LEARNED_TTL
+from custom_components.viessmann_cn.exceptions import ApiError, InvalidCredentials
+
+MARGIN = 300
+
+
+def _client(age=None, expires_in=None):
+    """Return a client holding a token of the given age, logins are counted."""
+    client = ViessmannClient("user", "password")
+    client.logins = 0
+
+    async def _login():
+        await asyncio.sleep(0)
+        client.logins += 1
+        client._token = f"token-{client.logins}"
+        client._token_issued_at = time.monotonic()
+
+    client._login = _login
+    if age is not None:
+        client._token = "token-0"
+        client._token_issued_at = time.monotonic() - age
+        client._token_expires_in = expires_in
+    return client
+
+
+@pytest.mark.parametrize(
+    ("age", "expires_in"),
+    [
+        # Lifetime unknown, the 401 path covers it
+        (10_000, None),
+        # Lifetime too short to refresh ahead of
+        (1_000, MARGIN),
+        # Not due yet
+        (100, 3_600),
+    ],
+)
+def test_refresh_skipped(age, expires_in):
+    client = _client(age, expires_in)
+    assert not asyncio.run(client.refresh_token_if_needed(MARGIN))
+    assert client.logins == 0
+    assert client._token == "token-0"
+
+
+def test_refresh_when_due():
+    client = _client(3_400, 3_600)
+    assert asyncio.run(client.refresh_token_if_needed(MARGIN))
+    assert client.logins == 1
+    assert client.proactive_refresh_count == 1
+    assert client._token == "token-1"
+
+
+def test_concurrent_refreshes_log_in_once():
+    client = _client(3_400, 3_600)
+
+    async def _refresh_twice():
+        return await asyncio.gather(
+            client.refresh_token_if_needed(MARGIN),
+            client.refresh_token_if_needed(MARGIN),
+        )
+
+    assert sorted(asyncio.run(_refresh_twice())) == [False, True]
+    assert client.logins == 1
+    assert client.proactive_refresh_count == 1
+
+
+def test_concurrent_relogins_log_in_once():
+    client = _client(100)
+
+    async def _relogin_twice():
+        await asyncio.gather(client._relogin("token-0"), client._relogin("token-0"))
+
+    asyncio.run(_relogin_twice())
+    assert client.logins == 1
+    assert client.reactive_refresh_count == 1
+
+
+def test_relogin_learns_lifetime():
+    client = _client(TOKEN_MIN_LEARNED_TTL + 60)
+    asyncio.run(client._relogin("token-0"))
+    assert client.token_ttl == pytest.approx(TOKEN_MIN_LEARNED_TTL + 60, abs=5)
+
+
+def test_relogin_ignores_early_401():
+    client = _client(TOKEN_MIN_LEARNED_TTL - 60)
+    asyncio.run(client._relogin("token-0"))
+    assert client.logins == 1
+    assert client.token_ttl is None
+
+
+def test_relogin_keeps_reported_lifetime():
+    client = _client(TOKEN_MIN_LEARNED_TTL + 60, expires_in=7_200)
+    asyncio.run(client._relogin("token-0"))
+    assert client._learned_ttl is None
+
+
+def _failing_login_client(error):
+    client = ViessmannClient("user", "password")
+    client._token = "token-0"
+
+    async def _request(*args, **kwargs):
+        raise error
+
+    client._request = _request
+    return client
+
+
+def test_failed_login_keeps_token():
+    client = _failing_login_client(ApiError("Invalid JSON response"))
+    with pytest.raises(ApiError) as excinfo:
+        asyncio.run(client.login())
+    assert not isinstance(excinfo.value, InvalidCredentials)
+    assert client._token == "token-0"
+
+
+def test_rejected_login_is_invalid_credentials():
+    client = _failing_login_client(ApiError("API Error: wrong password", 500))
+    with pytest.raises(InvalidCredentials):
+        asyncio.run(client.login())
+    assert client._token == "token-0"
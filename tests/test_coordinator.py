@@ -0,0 +1,87 @@
+"""Tests for the fault and running status transitions of the coordinator."""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.viessmann_cn.coordinator import (
+    ViessmannCoordinator,
+    ViessmannSnapshot,
+)
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _snapshot(minute, detail=None, scan_status=None):
+    at = START + timedelta(minutes=minute)
+    return ViessmannSnapshot(
+        detail=detail if detail is not None else {},
+        scan_status=scan_status if scan_status is not None else {},
+        updated_at=at,
+        detail_updated_at=at,
+    )
+
+
+@pytest.fixture
+def detector():
+    """Return the coordinator's edge detection on its own, with fired events."""
+    fired = []
+    coordinator = SimpleNamespace(
+        _edges={},
+        _async_fire_event=lambda event_type, pid, data: fired.append(data),
+    )
+
+    def detect(snapshot):
+        ViessmannCoordinator._async_detect_edges(coordinator, "pid", snapshot)
+
+    detect.fired = fired
+    return detect
+
+
+def test_observed_states_skip_unreported_fields():
+    assert _snapshot(0).observed_states() == {}
+
+    # An explicit empty fault is "no fault", a None running status is unknown
+    snapshot = _snapshot(0, {"faultStatus": ""}, {"runningStatus": None})
+    assert snapshot.observed_states() == {"fault": None}
+
+    snapshot = _snapshot(0, {"faultStatus": "E1"}, {"runningStatus": 2})
+    assert snapshot.observed_states() == {"fault": "E1", "running_status": 2}
+
+
+def test_running_status_ignores_empty_scan_status(detector):
+    detector(_snapshot(0, scan_status={"runningStatus": 1}))
+    detector(_snapshot(1, scan_status={}))
+    detector(_snapshot(2, scan_status={"runningStatus": None}))
+    assert detector.fired == []
+
+    detector(_snapshot(3, scan_status={"runningStatus": 2}))
+    assert len(detector.fired) == 1
+    event = detector.fired[0]
+    assert event["type"] == "running_status_changed"
+    assert event["running_status"] == 2
+    assert event["previous_running_status"] == 1
+    # The baseline survives the unreported samples
+    assert event["previous_since"] == START.isoformat()
+
+
+def test_fault_ignores_missing_fault_status(detector):
+    detector(_snapshot(0, detail={"faultStatus": ""}))
+    detector(_snapshot(1, detail={}))
+    assert detector.fired == []
+
+    detector(_snapshot(2, detail={"faultStatus": "E1"}))
+    detector(_snapshot(3, detail={}))
+    detector(_snapshot(4, detail={"faultStatus": "E2"}))
+    detector(_snapshot(5, detail={"faultStatus": ""}))
+    assert [event["type"] for event in detector.fired] == [
+        "fault_raised",
+        "fault_changed",
+        "fault_cleared",
+    ]
+
+
+def test_first_observation_fires_nothing(detector):
+    detector(_snapshot(0, {"faultStatus": "E1"}, {"runningStatus": 3}))
+    assert detector.fired == []
@@ -0,0 +1,93 @@
+"""Tests for the failure tracker."""
+
+import logging
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.viessmann_cn import failures
+from custom_components.viessmann_cn.failures import (
+    ISSUE_AFTER,
+    SUMMARY_INTERVAL,
+    FailureTracker,
+)
+
+
+@pytest.fixture
+def now(monkeypatch):
+    """Return a settable clock for the tracker, with a mocked issue registry."""
+    clock = [datetime(2026, 1, 1, tzinfo=timezone.utc)]
+    monkeypatch.setattr(failures.dt_util, "utcnow", lambda: clock[0])
+    monkeypatch.setattr(failures, "ir", MagicMock())
+    return clock
+
+
+@pytest.fixture
+def tracker(now):
+    return FailureTracker(MagicMock(), MagicMock(entry_id="entry", title="Test"))
+
+
+def _messages(caplog, level):
+    return [r.getMessage() for r in caplog.records if r.levelno == level]
+
+
+def test_outage_logs_once_across_devices(tracker, now, caplog):
+    caplog.set_level(logging.DEBUG, logger=failures.__name__)
+    error = ValueError("timeout")
+
+    for device in ("a", "b", "c"):
+        tracker.record_failure("Refresh", error, device)
+    assert _messages(caplog, logging.WARNING) == ["Refresh of a failed: timeout"]
+
+    now[0] += SUMMARY_INTERVAL
+    tracker.record_failure("Refresh", error, "a")
+    assert _messages(caplog, logging.WARNING)[-1].startswith(
+        "Refresh of 3 devices still failing: 4 failures"
+    )
+
+    tracker.record_success("Refresh", "a")
+    tracker.record_success("Refresh", "b")
+    assert tracker.failing == {"Refresh": 4}
+    assert not _messages(caplog, logging.INFO)
+
+    tracker.record_success("Refresh", "c")
+    assert tracker.failing == {}
+    assert len(_messages(caplog, logging.INFO)) == 1
+
+
+def test_success_of_healthy_device_keeps_failure(tracker):
+    tracker.record_failure("Refresh", ValueError("boom"), "a")
+    tracker.record_success("Refresh", "b")
+    assert tracker.failing == {"Refresh": 1}
+
+
+def test_forget_removed_device(tracker):
+    tracker.record_failure("Refresh", ValueError("boom"), "a")
+    tracker.record_failure("Detail refresh", ValueError("boom"), "a")
+    tracker.record_failure("Detail refresh", ValueError("boom"), "b")
+
+    tracker.async_forget("a")
+
+    assert tracker.failing == {"Detail refresh": 2}
+
+
+def test_issue_raised_once_and_cleared(tracker, now):
+    ir = failures.ir
+    tracker.record_failure("Device discovery", ValueError("boom"))
+    ir.async_create_issue.assert_not_called()
+
+    now[0] += ISSUE_AFTER
+    tracker.record_failure("Device discovery", ValueError("boom"))
+    tracker.record_failure("Device discovery", ValueError("boom"))
+    assert ir.async_create_issue.call_count == 1
+
+    now[0] += SUMMARY_INTERVAL
+    tracker.record_failure("Device discovery", ValueError("boom"))
+    assert ir.async_create_issue.call_count == 2
+    placeholders = ir.async_create_issue.call_args.kwargs["translation_placeholders"]
+    assert placeholders["count"] == "4"
+
+    deletes = ir.async_delete_issue.call_count
+    tracker.record_success("Device discovery")
+    assert ir.async_delete_issue.call_count == deletes + 1